@@ -24,9 +24,15 @@ def demo_document_processing():
         "examples/rag_system.md"
     ]
     
+    # One directory read instead of a stat call per sample document
+    try:
+        present = {f"examples/{entry.name}" for entry in os.scandir("examples")}
+    except FileNotFoundError:
+        present = set()
+
     documents = []
     for doc_path in sample_docs:
-        if os.path.exists(doc_path):
+        if doc_path in present:
             doc = document_processor.process_file(doc_path)
             if doc:
                 documents.append(doc)
@@ -7,6 +7,8 @@ import sys
 import os
 from pathlib import Path
 
+import uvicorn
+
 # Add src directory to Python path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
@@ -32,13 +34,32 @@ def main():
         logger.info(f"Configuration: {config.HOST}:{config.PORT}")
         logger.info(f"Debug mode: {config.DEBUG}")
         
-        # Import and run the FastAPI app
-        import uvicorn
+        if config.HTTP2:
+            # Serve over HTTP/2 via hypercorn so browser clients multiplex
+            # chat, upload and status polls on a single connection
+            import asyncio
+            from hypercorn.asyncio import serve
+            from hypercorn.config import Config as HypercornConfig
+
+            h2_config = HypercornConfig.from_mapping(
+                bind=[f"{config.HOST}:{config.PORT}"],
+                alpn_protocols=["h2", "http/1.1"]
+            )
+            asyncio.run(serve(app, h2_config))
+            return
+
+        # Run the FastAPI app (uvloop + httptools come from uvicorn[standard]).
+        # The file watcher is gated on RELOAD, not DEBUG, so debug runs don't
+        # pay for constant tree stats; reload and workers>1 are mutually
+        # exclusive in uvicorn
         uvicorn.run(
             "src.api:app",
             host=config.HOST,
             port=config.PORT,
-            reload=config.DEBUG,
+            loop="uvloop",
+            http="httptools",
+            reload=config.RELOAD,
+            workers=1 if config.RELOAD else config.WORKERS,
             log_level="info"
         )
         
@@ -81,10 +81,15 @@ def validate_setup():
         "main.py"
     ]
     
-    missing_files = []
-    for file_path in required_files:
-        if not os.path.exists(file_path):
-            missing_files.append(file_path)
+    # One directory read per directory instead of a stat call per file
+    try:
+        present = {f"src/{entry.name}" for entry in os.scandir("src")}
+    except FileNotFoundError:
+        present = set()
+    present |= {entry.name for entry in os.scandir(".")}
+
+    missing_files = [file_path for file_path in required_files
+                     if file_path not in present]
     
     if missing_files:
         print(f"❌ Missing required files: {missing_files}")
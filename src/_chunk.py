@@ -0,0 +1,96 @@
+"""
+Offset-based text chunking, compiled with Numba when available.
+"""
+from typing import List
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    njit = None
+    NUMBA_AVAILABLE = False
+
+_NEWLINE = 10
+_SPACE = 32
+
+def _split_impl(codes, chunk_size, overlap, out):
+    """Fill out with [start, end) chunk offsets; returns the chunk count.
+
+    Returns -1 if out has too few rows for the chunk count.
+
+    Scans backward from start+chunk_size for the highest-priority separator
+    (paragraph break, newline, space), mirroring the splitter's separator
+    order ["\\n\\n", "\\n", " ", ""].
+    """
+    n = codes.shape[0]
+    count = 0
+    start = 0
+    while start < n:
+        if count >= out.shape[0]:
+            return -1  # buffer too small; caller grows it and retries
+        end = start + chunk_size
+        if end >= n:
+            out[count, 0] = start
+            out[count, 1] = n
+            count += 1
+            break
+
+        cut = -1
+        # Paragraph break
+        for i in range(end, start + 1, -1):
+            if codes[i - 1] == _NEWLINE and codes[i - 2] == _NEWLINE:
+                cut = i
+                break
+        # Newline
+        if cut == -1:
+            for i in range(end, start, -1):
+                if codes[i - 1] == _NEWLINE:
+                    cut = i
+                    break
+        # Space
+        if cut == -1:
+            for i in range(end, start, -1):
+                if codes[i - 1] == _SPACE:
+                    cut = i
+                    break
+        if cut == -1:
+            cut = end
+
+        out[count, 0] = start
+        out[count, 1] = cut
+        count += 1
+
+        next_start = cut - overlap
+        if next_start <= start:
+            next_start = cut
+        start = next_start
+    return count
+
+if NUMBA_AVAILABLE:
+    _split_impl = njit(cache=True)(_split_impl)
+
+def split_offsets(text: str, chunk_size: int, overlap: int) -> np.ndarray:
+    """Return an (N, 2) array of [start, end) character offsets into text."""
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    step = max(1, chunk_size - overlap)
+    rows = codes.shape[0] // step + 2
+    while True:
+        out = np.empty((rows, 2), dtype=np.int64)
+        count = _split_impl(codes, chunk_size, overlap, out)
+        if count >= 0:
+            return out[:count]
+        # Dense separators can produce more chunks than the estimate
+        rows *= 2
+
+def split_text(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """Split text into overlapping chunks via the offset kernel."""
+    if not text:
+        return []
+    chunks = []
+    for start, end in split_offsets(text, chunk_size, overlap):
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+    return chunks
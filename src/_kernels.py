@@ -0,0 +1,38 @@
+"""
+Numba-accelerated similarity kernels for retrieval and caching.
+"""
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _dot_scores(query, mat):
+        """Row-wise dot products of a matrix against a query vector."""
+        n, d = mat.shape
+        scores = np.empty(n, dtype=np.float32)
+        for i in prange(n):
+            s = 0.0
+            for j in range(d):
+                s += mat[i, j] * query[j]
+            scores[i] = s
+        return scores
+else:
+    def _dot_scores(query, mat):
+        return mat @ query
+
+def topk_cosine(query: np.ndarray, mat: np.ndarray, k: int):
+    """Return (indices, scores) of the k rows of mat most similar to query.
+
+    Rows and query are expected to be L2-normalized, so the dot product is
+    the cosine similarity. Results are sorted by descending score.
+    """
+    scores = _dot_scores(np.ascontiguousarray(query, dtype=np.float32),
+                         np.ascontiguousarray(mat, dtype=np.float32))
+    k = min(k, scores.shape[0])
+    top = np.argpartition(scores, -k)[-k:]
+    top = top[np.argsort(scores[top])[::-1]]
+    return top, scores[top]
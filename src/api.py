@@ -1,18 +1,26 @@
 """
 FastAPI backend for the RAG system.
 """
+import asyncio
+import concurrent.futures
 import logging
 import os
+import threading
+from contextlib import asynccontextmanager
 from typing import List, Dict, Any, Optional
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, HTTPException, Response, UploadFile, File, Form
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import HTMLResponse, ORJSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.requests import Request
+import msgspec
+import orjson
 from pydantic import BaseModel
 import uvicorn
 
 from .rag_pipeline import rag_pipeline
+from .semantic_cache import semantic_cache
 from .document_processor import document_processor
 from .llm_manager import llm_manager
 from .vector_store import vector_store
@@ -22,22 +30,74 @@ from .config import config
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm up heavy components before the first request is served."""
+    await asyncio.gather(
+        asyncio.to_thread(rag_pipeline.warmup),
+        asyncio.to_thread(semantic_cache.warmup)
+    )
+    yield
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Conversational AI with RAG",
     description="A powerful RAG system with modular LLM integration",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Pydantic models
-class ChatMessage(BaseModel):
+# Compress JSON payloads (provider lists, vector-store stats, long LLM
+# answers) transparently; tiny responses are left alone
+class _GZipExceptSSE:
+    """GZip middleware that bypasses the SSE endpoint.
+
+    Starlette's GZipResponder buffers streamed bodies without flushing, so
+    compressing /chat/stream would hold the few-byte token events in the
+    zlib buffer and undo the time-to-first-token win of streaming.
+    """
+
+    def __init__(self, app, minimum_size: int = 512):
+        self.app = app
+        self.gzip = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/chat/stream":
+            await self.app(scope, receive, send)
+        else:
+            await self.gzip(scope, receive, send)
+
+app.add_middleware(_GZipExceptSSE, minimum_size=512)
+
+# Request models for the hot /chat path are msgspec Structs: the body is
+# decoded straight into C-level structs without intermediate dicts
+class ChatMessage(msgspec.Struct):
     role: str
     content: str
 
-class ChatRequest(BaseModel):
+class ChatRequest(msgspec.Struct):
     messages: List[ChatMessage]
     provider: Optional[str] = None
 
+_chat_decoder = msgspec.json.Decoder(ChatRequest)
+
+def _chat_response(response: str, context_used: bool) -> Response:
+    """Serialize a /chat payload with a single specialized orjson call.
+
+    The schema is three known fields (see ChatResponse), so the generic
+    jsonable_encoder/model pipeline is skipped entirely on the hot path.
+    """
+    return Response(
+        content=orjson.dumps({
+            "response": response,
+            "provider": llm_manager.active_provider or "unknown",
+            "context_used": context_used
+        }),
+        media_type="application/json"
+    )
+
+# Pydantic models
 class ChatResponse(BaseModel):
     response: str
     provider: str
@@ -54,11 +114,9 @@ class SystemInfo(BaseModel):
     active_llm: Optional[str]
     vector_store: Dict[str, Any]
 
-# API endpoints
-@app.get("/", response_class=HTMLResponse)
-async def root(request: Request):
-    """Serve the main web interface."""
-    return """
+# Main web interface, encoded once at import time so the root handler
+# serves pre-built bytes instead of re-encoding the string per request
+_INDEX_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
@@ -120,22 +178,40 @@ async def root(request: Request):
                 addMessage('user', message);
                 input.value = '';
                 
+                // Stream the response so tokens appear as they are generated
+                const assistantDiv = addMessage('assistant', '');
                 try {
-                    const response = await fetch('/chat', {
+                    const response = await fetch('/chat/stream', {
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json' },
                         body: JSON.stringify({
                             messages: [{ role: 'user', content: message }]
                         })
                     });
-                    
-                    const data = await response.json();
-                    addMessage('assistant', data.response);
+
+                    const reader = response.body.getReader();
+                    const decoder = new TextDecoder();
+                    let buffer = '';
+                    while (true) {
+                        const { done, value } = await reader.read();
+                        if (done) break;
+                        buffer += decoder.decode(value, { stream: true });
+                        const events = buffer.split('\\n\\n');
+                        buffer = events.pop();
+                        for (const event of events) {
+                            if (!event.startsWith('data: ')) continue;
+                            const data = event.slice(6);
+                            if (data === '[DONE]') continue;
+                            assistantDiv.textContent += JSON.parse(data);
+                        }
+                        const messagesDiv = document.getElementById('chatMessages');
+                        messagesDiv.scrollTop = messagesDiv.scrollHeight;
+                    }
                 } catch (error) {
-                    addMessage('assistant', 'Sorry, I encountered an error. Please try again.');
+                    assistantDiv.textContent = 'Sorry, I encountered an error. Please try again.';
                 }
             }
-            
+
             function addMessage(role, content) {
                 const messagesDiv = document.getElementById('chatMessages');
                 const messageDiv = document.createElement('div');
@@ -143,6 +219,7 @@ async def root(request: Request):
                 messageDiv.textContent = content;
                 messagesDiv.appendChild(messageDiv);
                 messagesDiv.scrollTop = messagesDiv.scrollHeight;
+                return messageDiv;
             }
             
             async function uploadFiles() {
@@ -188,74 +265,157 @@ async def root(request: Request):
     </body>
     </html>
     """
+_INDEX_HTML_BYTES = _INDEX_HTML.encode("utf-8")
+
+# API endpoints
+@app.get("/", response_class=HTMLResponse)
+async def root():
+    """Serve the main web interface."""
+    return Response(
+        content=_INDEX_HTML_BYTES,
+        media_type="text/html",
+        headers={"Cache-Control": "public, max-age=3600"}
+    )
 
-@app.post("/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+@app.post("/chat")
+async def chat(raw_request: Request):
     """Handle chat requests with RAG enhancement."""
+    try:
+        request = _chat_decoder.decode(await raw_request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
     try:
         if not request.messages:
             raise HTTPException(status_code=400, detail="No messages provided")
-        
-        # Convert to list of dicts for RAG pipeline
-        messages = [{"role": msg.role, "content": msg.content} for msg in request.messages]
-        
-        # Generate RAG-enhanced response
-        response = rag_pipeline.chat(messages, provider=request.provider)
+
+        # C-level conversion to the dict shape the RAG pipeline expects
+        messages = msgspec.to_builtins(request.messages)
+
+        # Near-duplicate queries are answered from the semantic cache,
+        # skipping the retrieval + LLM round-trip entirely. The query is
+        # embedded once here and the vector shared by get and put
+        query = messages[-1]["content"] if messages[-1]["role"] == "user" else None
+        query_vector = None
+        if query:
+            try:
+                query_vector = await asyncio.to_thread(semantic_cache.embed, query)
+            except Exception as e:
+                logger.error(f"Error embedding query for semantic cache: {e}")
+        if query_vector is not None:
+            cached = await asyncio.to_thread(semantic_cache.get, query, query_vector)
+            if cached is not None:
+                return _chat_response(cached, context_used=True)
+
+        # Generate RAG-enhanced response off the event loop so concurrent
+        # requests are not serialized behind a slow embedding/LLM call
+        response = await asyncio.to_thread(rag_pipeline.chat, messages, provider=request.provider)
+
+        if query_vector is not None:
+            await asyncio.to_thread(semantic_cache.put, query, response, query_vector)
         
         # Check if context was used
         context_used = len(request.messages) > 0
-        
-        return ChatResponse(
-            response=response,
-            provider=llm_manager.active_provider or "unknown",
-            context_used=context_used
-        )
+
+        return _chat_response(response, context_used=context_used)
         
     except Exception as e:
         logger.error(f"Error in chat endpoint: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/upload", response_model=DocumentUploadResponse)
+@app.post("/chat/stream")
+async def chat_stream(raw_request: Request):
+    """Stream a chat response as Server-Sent Events, token by token."""
+    try:
+        request = _chat_decoder.decode(await raw_request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    if not request.messages:
+        raise HTTPException(status_code=400, detail="No messages provided")
+
+    messages = msgspec.to_builtins(request.messages)
+
+    async def event_stream():
+        # The provider stream is blocking, so a worker thread feeds tokens
+        # into a queue that this async generator drains
+        queue: asyncio.Queue = asyncio.Queue()
+        loop = asyncio.get_running_loop()
+        stop = threading.Event()
+
+        def produce():
+            try:
+                for token in rag_pipeline.chat_stream(messages, provider=request.provider):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, token)
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, None)
+
+        producer = loop.run_in_executor(None, produce)
+        try:
+            while (token := await queue.get()) is not None:
+                # JSON-encode each token so newlines survive SSE framing
+                yield b"data: " + orjson.dumps(token) + b"\n\n"
+            yield b"data: [DONE]\n\n"
+            await producer
+        finally:
+            # On client disconnect the generator is closed here; tell the
+            # producer to stop instead of awaiting it (awaiting a pending
+            # future during close raises, and the thread would keep
+            # draining the LLM stream into a queue nobody reads)
+            stop.set()
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+# Dedicated pool for CPU-bound upload parsing, sized to the machine so
+# independent files parse in parallel instead of queueing behind each other
+_UPLOAD_POOL = concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count())
+
+@app.post("/upload")
 async def upload_documents(files: List[UploadFile] = File(...)):
     """Upload and process documents."""
     try:
         if not files:
             raise HTTPException(status_code=400, detail="No files provided")
         
-        processed_documents = []
-        
-        for file in files:
+        async def _handle_file(file: UploadFile) -> Optional[Dict[str, Any]]:
+            """Process one upload directly from memory, off the event loop."""
             try:
-                # Save uploaded file temporarily
-                temp_path = f"temp_{file.filename}"
-                with open(temp_path, "wb") as buffer:
-                    content = await file.read()
-                    buffer.write(content)
-                
-                # Process document
-                document = document_processor.process_file(temp_path)
-                if document:
-                    processed_documents.append(document)
-                
-                # Clean up temp file
-                os.remove(temp_path)
-                
+                # The upload is already in memory; hand the bytes straight to
+                # the processor instead of round-tripping through a temp file
+                content = await file.read()
+                document = await asyncio.get_running_loop().run_in_executor(
+                    _UPLOAD_POOL, document_processor.process_bytes,
+                    file.filename or "upload", content)
+
+                return document
+
             except Exception as e:
                 logger.error(f"Error processing file {file.filename}: {e}")
-                continue
-        
+                return None
+
+        # Process all uploaded files concurrently; one bad file must not
+        # take down the whole batch
+        results = await asyncio.gather(*[_handle_file(file) for file in files],
+                                       return_exceptions=True)
+        processed_documents = [document for document in results
+                               if document and not isinstance(document, BaseException)]
+
         if not processed_documents:
             raise HTTPException(status_code=400, detail="No valid documents could be processed")
-        
-        # Add to RAG pipeline
-        success = rag_pipeline.process_documents(processed_documents)
+
+        # Add to RAG pipeline, embedding chunks in batches across all files
+        success = await asyncio.to_thread(rag_pipeline.process_documents_batched, processed_documents)
         
         if success:
-            return DocumentUploadResponse(
+            # New documents can change answers, so drop cached responses
+            semantic_cache.clear()
+            return ORJSONResponse(content=DocumentUploadResponse(
                 success=True,
                 message=f"Successfully processed {len(processed_documents)} documents",
                 documents_processed=len(processed_documents)
-            )
+            ).model_dump())
         else:
             raise HTTPException(status_code=500, detail="Failed to process documents")
         
@@ -273,18 +433,30 @@ async def get_documents():
         logger.error(f"Error getting documents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/models")
-async def get_models():
-    """Get available LLM models."""
-    try:
-        return {
-            "available_providers": llm_manager.get_available_providers(),
+# Provider configuration is static for a process lifetime except for
+# explicit provider switches, so /models serves a memoized payload
+_models_payload: Optional[Dict[str, Any]] = None
+
+def _get_models_payload() -> Dict[str, Any]:
+    """Build (once) and return the /models response payload."""
+    global _models_payload
+    if _models_payload is None:
+        providers = llm_manager.get_available_providers()
+        _models_payload = {
+            "available_providers": providers,
             "active_provider": llm_manager.active_provider,
             "provider_info": {
                 provider: llm_manager.get_provider_info(provider)
-                for provider in llm_manager.get_available_providers()
+                for provider in providers
             }
         }
+    return _models_payload
+
+@app.get("/models")
+async def get_models():
+    """Get available LLM models."""
+    try:
+        return _get_models_payload()
     except Exception as e:
         logger.error(f"Error getting models: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -292,9 +464,12 @@ async def get_models():
 @app.post("/switch_provider/{provider}")
 async def switch_provider(provider: str):
     """Switch to a different LLM provider."""
+    global _models_payload
     try:
         success = llm_manager.set_active_provider(provider)
         if success:
+            # Invalidate the memoized /models payload
+            _models_payload = None
             return {"message": f"Switched to {provider} provider", "active_provider": provider}
         else:
             raise HTTPException(status_code=400, detail=f"Provider {provider} not available")
@@ -302,16 +477,16 @@ async def switch_provider(provider: str):
         logger.error(f"Error switching provider: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/system_info", response_model=SystemInfo)
+@app.get("/system_info")
 async def get_system_info():
     """Get comprehensive system information."""
     try:
-        return SystemInfo(
+        return ORJSONResponse(content=SystemInfo(
             rag_pipeline=rag_pipeline.get_pipeline_info(),
             available_llms=llm_manager.get_available_providers(),
             active_llm=llm_manager.active_provider,
             vector_store=vector_store.get_collection_info()
-        )
+        ).model_dump())
     except Exception as e:
         logger.error(f"Error getting system info: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -325,11 +500,15 @@ if __name__ == "__main__":
     # Validate configuration
     config.validate()
     
-    # Run the application
+    # Run the application (uvloop + httptools need uvicorn[standard]);
+    # reload and workers>1 are mutually exclusive in uvicorn
     uvicorn.run(
         "src.api:app",
         host=config.HOST,
         port=config.PORT,
-        reload=config.DEBUG
+        loop="uvloop",
+        http="httptools",
+        reload=config.RELOAD,
+        workers=1 if config.RELOAD else config.WORKERS
     )
 
@@ -2,67 +2,106 @@
 Configuration management for the RAG system.
 """
 import os
-from typing import Optional
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Final, Mapping, Optional
+
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Static model catalog, built once and exposed read-only
+_AVAILABLE_MODELS: Final[Mapping[str, Mapping[str, str]]] = MappingProxyType({
+    "openai": MappingProxyType({
+        "gpt-3.5-turbo": "GPT-3.5 Turbo (OpenAI)",
+        "gpt-4": "GPT-4 (OpenAI)",
+        "gpt-4-turbo": "GPT-4 Turbo (OpenAI)"
+    }),
+    "huggingface": MappingProxyType({
+        "meta-llama/Llama-2-7b-chat-hf": "Llama 2 7B Chat (Hugging Face)",
+        "microsoft/DialoGPT-medium": "DialoGPT Medium (Hugging Face)",
+        "google/flan-t5-base": "Flan-T5 Base (Hugging Face)"
+    })
+})
+
+@dataclass(frozen=True)
 class Config:
-    """Centralized configuration management."""
-    
+    """Centralized configuration, parsed once from the environment.
+
+    Frozen so threadpool workers can read it without races. (No slots=True:
+    that dataclass flag needs Python 3.10 and setup.py supports 3.8+.)
+    """
+
     # OpenAI Configuration
-    OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
-    OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
-    
+    OPENAI_API_KEY: Optional[str]
+    OPENAI_MODEL: str
+
     # Hugging Face Configuration
-    HUGGINGFACE_API_KEY: Optional[str] = os.getenv("HUGGINGFACE_API_KEY")
-    HUGGINGFACE_MODEL: str = os.getenv("HUGGINGFACE_MODEL", "meta-llama/Llama-2-7b-chat-hf")
-    
+    HUGGINGFACE_API_KEY: Optional[str]
+    HUGGINGFACE_MODEL: str
+
     # Chroma Configuration
-    CHROMA_PERSIST_DIRECTORY: str = os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db")
-    CHROMA_COLLECTION_NAME: str = os.getenv("CHROMA_COLLECTION_NAME", "documents")
-    
+    CHROMA_PERSIST_DIRECTORY: str
+    CHROMA_COLLECTION_NAME: str
+
     # Application Configuration
-    HOST: str = os.getenv("HOST", "0.0.0.0")
-    PORT: int = int(os.getenv("PORT", "8000"))
-    DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
-    
+    HOST: str
+    PORT: int
+    DEBUG: bool
+    RELOAD: bool
+    WORKERS: int
+    HTTP2: bool
+
     # Embedding Model
-    EMBEDDING_MODEL: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
-    
+    EMBEDDING_MODEL: str
+
     # RAG Configuration
-    CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "1000"))
-    CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "200"))
-    TOP_K_RETRIEVAL: int = int(os.getenv("TOP_K_RETRIEVAL", "5"))
-    TEMPERATURE: float = float(os.getenv("TEMPERATURE", "0.7"))
-    MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "1000"))
-    
-    @classmethod
-    def validate(cls) -> bool:
+    CHUNK_SIZE: int
+    CHUNK_OVERLAP: int
+    EMBEDDING_BATCH_SIZE: int
+    SEMANTIC_CACHE_THRESHOLD: float
+    SEMANTIC_CACHE_TTL: int
+    TOP_K_RETRIEVAL: int
+    TEMPERATURE: float
+    MAX_TOKENS: int
+
+    def validate(self) -> bool:
         """Validate that required configuration is present."""
-        if not cls.OPENAI_API_KEY and not cls.HUGGINGFACE_API_KEY:
+        if not self.OPENAI_API_KEY and not self.HUGGINGFACE_API_KEY:
             print("Warning: No API keys configured. Some features may not work.")
             return False
         return True
-    
-    @classmethod
-    def get_available_models(cls) -> dict:
+
+    def get_available_models(self) -> Mapping[str, Mapping[str, str]]:
         """Get available LLM models."""
-        models = {
-            "openai": {
-                "gpt-3.5-turbo": "GPT-3.5 Turbo (OpenAI)",
-                "gpt-4": "GPT-4 (OpenAI)",
-                "gpt-4-turbo": "GPT-4 Turbo (OpenAI)"
-            },
-            "huggingface": {
-                "meta-llama/Llama-2-7b-chat-hf": "Llama 2 7B Chat (Hugging Face)",
-                "microsoft/DialoGPT-medium": "DialoGPT Medium (Hugging Face)",
-                "google/flan-t5-base": "Flan-T5 Base (Hugging Face)"
-            }
-        }
-        return models
+        return _AVAILABLE_MODELS
 
-# Global configuration instance
-config = Config()
+def load_config() -> Config:
+    """Read the environment once and build an immutable Config."""
+    return Config(
+        OPENAI_API_KEY=os.getenv("OPENAI_API_KEY"),
+        OPENAI_MODEL=os.getenv("OPENAI_MODEL", "gpt-3.5-turbo"),
+        HUGGINGFACE_API_KEY=os.getenv("HUGGINGFACE_API_KEY"),
+        HUGGINGFACE_MODEL=os.getenv("HUGGINGFACE_MODEL", "meta-llama/Llama-2-7b-chat-hf"),
+        CHROMA_PERSIST_DIRECTORY=os.getenv("CHROMA_PERSIST_DIRECTORY", "./chroma_db"),
+        CHROMA_COLLECTION_NAME=os.getenv("CHROMA_COLLECTION_NAME", "documents"),
+        HOST=os.getenv("HOST", "0.0.0.0"),
+        PORT=int(os.getenv("PORT", "8000")),
+        DEBUG=os.getenv("DEBUG", "True").lower() == "true",
+        RELOAD=os.getenv("RELOAD", "False").lower() == "true",
+        WORKERS=int(os.getenv("WORKERS", str(max(1, (os.cpu_count() or 1) // 2)))),
+        HTTP2=os.getenv("HTTP2", "False").lower() == "true",
+        EMBEDDING_MODEL=os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"),
+        CHUNK_SIZE=int(os.getenv("CHUNK_SIZE", "1000")),
+        CHUNK_OVERLAP=int(os.getenv("CHUNK_OVERLAP", "200")),
+        EMBEDDING_BATCH_SIZE=int(os.getenv("EMBEDDING_BATCH_SIZE", "64")),
+        SEMANTIC_CACHE_THRESHOLD=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+        SEMANTIC_CACHE_TTL=int(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+        TOP_K_RETRIEVAL=int(os.getenv("TOP_K_RETRIEVAL", "5")),
+        TEMPERATURE=float(os.getenv("TEMPERATURE", "0.7")),
+        MAX_TOKENS=int(os.getenv("MAX_TOKENS", "1000"))
+    )
 
+# Global configuration instance
+config = load_config()
@@ -1,17 +1,144 @@
 """
 Document processing utilities for various file formats.
 """
+import concurrent.futures
+import hashlib
+import mmap
 import os
 import logging
+import re
 from typing import List, Dict, Any, Optional
 from pathlib import Path
-import requests
-from bs4 import BeautifulSoup
-import markdown
 from .config import config
 
+# requests, bs4 and markdown are imported where they're used so that
+# importing this module (e.g. for file-only ingestion) stays cheap
+
 logger = logging.getLogger(__name__)
 
+# Prefer the C-backed lxml parser; fall back to the stdlib parser so the
+# dependency stays optional
+try:
+    from lxml import etree as _etree
+    _BS_PARSER = 'lxml'
+except ImportError:
+    _etree = None
+    _BS_PARSER = 'html.parser'
+
+# Hard cap on downloaded page size so one huge response can't OOM ingestion
+_MAX_URL_BYTES = 32 << 20
+
+# Titles live in <head>, so a regex over the first few KB replaces a full
+# parse when only the title is needed
+_TITLE_RE = re.compile(rb'<title[^>]*>(.*?)</title>', re.IGNORECASE | re.DOTALL)
+
+# <meta charset="..."> / <meta http-equiv content="...; charset=...">
+_CHARSET_RE = re.compile(rb'charset=["\']?([\w.-]+)', re.IGNORECASE)
+
+def _decode_html(data: bytes, declared: str = None) -> str:
+    """Decode HTML bytes, sniffing <meta charset> when the header is silent.
+
+    requests defaults charset-less text responses to ISO-8859-1, which
+    turns the common UTF-8-without-header page into mojibake; UTF-8 is the
+    sane fallback when neither the header nor the markup declares one.
+    """
+    encoding = declared
+    if not encoding:
+        m = _CHARSET_RE.search(data[:8192])
+        if m:
+            encoding = m.group(1).decode('ascii', 'replace')
+    try:
+        return data.decode(encoding or 'utf-8', errors='replace')
+    except LookupError:
+        return data.decode('utf-8', errors='replace')
+
+# Native html-to-markdown converter does tokenize+walk+emit in one pass
+# without materializing a soup tree; optional, BeautifulSoup remains the
+# fallback
+try:
+    from html_to_markdown import convert_to_markdown as _convert_to_markdown
+except ImportError:
+    _convert_to_markdown = None
+
+# Files above this size are read through mmap so decoding pulls straight
+# from the page cache instead of an extra userspace buffer
+_MMAP_THRESHOLD = 1 << 20
+
+def _read_file_text(file_path: Path) -> str:
+    """Read a file as UTF-8 text, memory-mapping large files."""
+    if file_path.stat().st_size > _MMAP_THRESHOLD:
+        with open(file_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[:].decode('utf-8', errors='replace')
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+# blake3 is SIMD-accelerated and parallelizes over large inputs; blake2b
+# from the stdlib is the fallback. Both are stable across processes,
+# unlike hash(), which is randomized per run by PYTHONHASHSEED
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:
+    _blake3 = None
+
+def _content_id(data: str) -> str:
+    """Stable 16-byte hex digest for content-addressed document IDs."""
+    encoded = data.encode('utf-8')
+    if _blake3 is not None:
+        return _blake3(encoded).hexdigest(length=16)
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+# Markdown constructs stripped straight to plain text, applied in order;
+# avoids the markdown -> HTML -> parse round-trip entirely
+_MD_PATTERNS = [
+    (re.compile(r'^```[^\n]*\n(.*?)^```[ \t]*$', re.MULTILINE | re.DOTALL), r'\1'),  # code fences
+    (re.compile(r'`([^`]*)`'), r'\1'),                                               # inline code
+    (re.compile(r'!\[([^\]]*)\]\([^)]*\)'), r'\1'),                                  # images -> alt
+    (re.compile(r'\[([^\]]*)\]\([^)]*\)'), r'\1'),                                   # links -> text
+    (re.compile(r'^#{1,6}[ \t]*', re.MULTILINE), ''),                                # headings
+    (re.compile(r'^[ \t]*(?:[-*+]|\d+\.)[ \t]+', re.MULTILINE), ''),                 # list markers
+    (re.compile(r'(\*\*|__)(.*?)\1', re.DOTALL), r'\2'),                             # bold
+    (re.compile(r'(\*|_)(.*?)\1', re.DOTALL), r'\2'),                                # emphasis
+]
+
+def _markdown_to_text(md_content: str) -> str:
+    """Strip markdown syntax from content, leaving plain text."""
+    text = md_content
+    for pattern, replacement in _MD_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text.strip()
+
+# Shared session so URL ingestion reuses TCP/TLS connections instead of
+# re-negotiating per request; built lazily on the first fetch
+_session = None
+
+def _get_session():
+    """Return the pooled requests session, creating it on first use."""
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64,
+                              max_retries=Retry(total=2, backoff_factor=0.2))
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        _session = session
+    return _session
+
+def _html_to_text(html_content: str) -> str:
+    """Flatten HTML to plain text, preferring the native converter."""
+    if _convert_to_markdown is not None:
+        try:
+            return _convert_to_markdown(html_content).strip()
+        except Exception as e:
+            logger.error(f"Error in native HTML conversion, falling back: {e}")
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html_content, _BS_PARSER)
+    return soup.get_text(separator='\n', strip=True)
+
 class DocumentProcessor:
     """Process various document formats for RAG system."""
     
@@ -22,6 +149,12 @@ class DocumentProcessor:
             '.html': self._process_html,
             '.htm': self._process_html
         }
+        self._content_extractors = {
+            '.txt': lambda content: content,
+            '.md': self._extract_markdown,
+            '.html': self._extract_html,
+            '.htm': self._extract_html
+        }
     
     def process_file(self, file_path: str, metadata: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
         """Process a single file and return document data."""
@@ -64,24 +197,84 @@ class DocumentProcessor:
             logger.error(f"Error processing file {file_path}: {e}")
             return None
     
+    def process_bytes(self, name: str, data: bytes, metadata: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
+        """Process an in-memory document without a filesystem round-trip."""
+        try:
+            name_path = Path(name)
+            extension = name_path.suffix.lower()
+
+            if extension not in self._content_extractors:
+                logger.warning(f"Unsupported file extension: {extension}")
+                return None
+
+            content = data.decode('utf-8', errors='replace')
+            text_content = self._content_extractors[extension](content)
+
+            if not text_content:
+                logger.warning(f"No content extracted from upload: {name}")
+                return None
+
+            # Prepare document data
+            document = {
+                "id": str(name_path.stem),
+                "text": text_content,
+                "metadata": metadata or {},
+                "source": name,
+                "file_type": extension,
+                "file_size": len(data)
+            }
+
+            logger.info(f"Successfully processed upload: {name}")
+            return document
+
+        except Exception as e:
+            logger.error(f"Error processing upload {name}: {e}")
+            return None
+
+    def _iter_supported_files(self, directory):
+        """Yield supported file paths via os.scandir.
+
+        DirEntry caches the d_type from the directory read, so the walk
+        costs one getdents per directory instead of a stat per entry, and
+        the suffix check needs no syscall at all.
+        """
+        with os.scandir(directory) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._iter_supported_files(entry.path)
+                elif os.path.splitext(entry.name)[1].lower() in self.supported_extensions:
+                    yield entry.path
+
     def process_directory(self, directory_path: str, metadata: Dict[str, Any] = None) -> List[Dict[str, Any]]:
         """Process all supported files in a directory."""
         try:
-            directory_path = Path(directory_path)
-            
-            if not directory_path.exists() or not directory_path.is_dir():
+            if not os.path.isdir(directory_path):
                 logger.error(f"Directory not found: {directory_path}")
                 return []
-            
+
+            # Collect candidate files first so independent parses can overlap
+            file_paths = list(self._iter_supported_files(directory_path))
+
             documents = []
-            
-            # Process all files in directory
-            for file_path in directory_path.rglob("*"):
-                if file_path.is_file() and file_path.suffix.lower() in self.supported_extensions:
-                    document = self.process_file(str(file_path), metadata)
+
+            if len(file_paths) < 8:
+                # Pool setup isn't worth it for tiny directories
+                for file_path in file_paths:
+                    document = self.process_file(file_path, metadata)
                     if document:
                         documents.append(document)
-            
+            else:
+                # I/O and parsing overlap across files; lxml and the native
+                # converter release the GIL, so threads scale well here
+                max_workers = min(32, (os.cpu_count() or 1) * 4)
+                with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+                    futures = [pool.submit(self.process_file, file_path, metadata)
+                               for file_path in file_paths]
+                    for future in concurrent.futures.as_completed(futures):
+                        document = future.result()
+                        if document:
+                            documents.append(document)
+
             logger.info(f"Processed {len(documents)} documents from directory: {directory_path}")
             return documents
             
@@ -89,30 +282,72 @@ class DocumentProcessor:
             logger.error(f"Error processing directory {directory_path}: {e}")
             return []
     
+    def _fetch_url_streaming(self, url: str) -> tuple:
+        """Download and parse a URL incrementally, returning (text, title).
+
+        Chunks are fed to lxml's pull parser as they arrive, so parsing
+        overlaps the download and peak memory stays bounded by the parse
+        tree instead of raw body + tree.
+        """
+        with _get_session().get(url, stream=True, timeout=30) as response:
+            response.raise_for_status()
+
+            parser = _etree.HTMLPullParser(events=('end',))
+            total = 0
+            for chunk in response.iter_content(65536):
+                total += len(chunk)
+                if total > _MAX_URL_BYTES:
+                    raise ValueError(f"URL payload exceeds {_MAX_URL_BYTES} bytes: {url}")
+                parser.feed(chunk)
+                # Drain events as they complete to keep the queue small
+                for _event, _element in parser.read_events():
+                    pass
+            root = parser.close()
+
+        _etree.strip_elements(root, 'script', 'style', with_tail=False)
+
+        title_element = root.find('.//title')
+        title = (title_element.text.strip()
+                 if title_element is not None and title_element.text else "Unknown")
+        text_content = '\n'.join(part.strip() for part in root.itertext() if part.strip())
+        return text_content, title
+
     def process_url(self, url: str, metadata: Dict[str, Any] = None) -> Optional[Dict[str, Any]]:
         """Process content from a URL."""
         try:
-            response = requests.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # Parse HTML content
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract text content
-            text_content = soup.get_text(separator='\n', strip=True)
-            
+            if _etree is not None:
+                # Streaming parse with a bounded download size
+                text_content, title = self._fetch_url_streaming(url)
+            else:
+                response = _get_session().get(url, timeout=30)
+                response.raise_for_status()
+
+                # Decode from bytes ourselves: only trust the header charset
+                # when one was actually sent, then sniff the meta tag
+                content_type = response.headers.get('Content-Type', '')
+                declared = None
+                if 'charset=' in content_type:
+                    declared = content_type.split('charset=')[-1].split(';')[0].strip('"\' ')
+
+                # Extract text content
+                text_content = _html_to_text(_decode_html(response.content, declared))
+
+                # Cheap regex title lookup instead of a second parse
+                m = _TITLE_RE.search(response.content[:8192])
+                title = m.group(1).decode('utf-8', 'replace').strip() if m else "Unknown"
+
             if not text_content:
                 logger.warning(f"No text content extracted from URL: {url}")
                 return None
             
             # Prepare document data
             document = {
-                "id": f"url_{hash(url)}",
+                "id": f"url_{_content_id(url)}",
                 "text": text_content,
                 "metadata": metadata or {},
                 "source": url,
                 "file_type": "url",
-                "title": soup.title.string if soup.title else "Unknown"
+                "title": title
             }
             
             logger.info(f"Successfully processed URL: {url}")
@@ -122,11 +357,31 @@ class DocumentProcessor:
             logger.error(f"Error processing URL {url}: {e}")
             return None
     
+    def process_urls(self, urls: List[str], metadata: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """Process multiple URLs concurrently over pooled connections."""
+        try:
+            documents = []
+
+            max_workers = min(16, max(1, len(urls)))
+            with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as pool:
+                futures = [pool.submit(self.process_url, url, metadata) for url in urls]
+                for future in concurrent.futures.as_completed(futures):
+                    document = future.result()
+                    if document:
+                        documents.append(document)
+
+            logger.info(f"Processed {len(documents)} of {len(urls)} URLs")
+            return documents
+
+        except Exception as e:
+            logger.error(f"Error processing URLs: {e}")
+            return []
+
     def process_text(self, text: str, metadata: Dict[str, Any] = None) -> Dict[str, Any]:
         """Process raw text content."""
         try:
             document = {
-                "id": f"text_{hash(text)}",
+                "id": f"text_{_content_id(text)}",
                 "text": text,
                 "metadata": metadata or {},
                 "source": "raw_text",
@@ -144,8 +399,7 @@ class DocumentProcessor:
     def _process_text(self, file_path: Path) -> str:
         """Process plain text file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return f.read()
+            return _read_file_text(file_path)
         except Exception as e:
             logger.error(f"Error reading text file {file_path}: {e}")
             return ""
@@ -155,29 +409,35 @@ class DocumentProcessor:
         try:
             with open(file_path, 'r', encoding='utf-8') as f:
                 md_content = f.read()
-            
-            # Convert markdown to HTML then extract text
-            html_content = markdown.markdown(md_content)
-            soup = BeautifulSoup(html_content, 'html.parser')
-            return soup.get_text(separator='\n', strip=True)
-            
+
+            return self._extract_markdown(md_content)
+
         except Exception as e:
             logger.error(f"Error processing markdown file {file_path}: {e}")
             return ""
-    
+
     def _process_html(self, file_path: Path) -> str:
         """Process HTML file."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            # Parse HTML and extract text
-            soup = BeautifulSoup(html_content, 'html.parser')
-            return soup.get_text(separator='\n', strip=True)
-            
+            return self._extract_html(_read_file_text(file_path))
+
         except Exception as e:
             logger.error(f"Error processing HTML file {file_path}: {e}")
             return ""
+
+    def _extract_markdown(self, md_content: str) -> str:
+        """Extract plain text from markdown content."""
+        try:
+            # Strip markdown syntax directly; no HTML round-trip needed
+            return _markdown_to_text(md_content)
+        except Exception as e:
+            logger.error(f"Error stripping markdown, falling back to HTML path: {e}")
+            import markdown
+            return self._extract_html(markdown.markdown(md_content))
+
+    def _extract_html(self, html_content: str) -> str:
+        """Extract plain text from HTML content."""
+        return _html_to_text(html_content)
     
     def get_supported_formats(self) -> List[str]:
         """Get list of supported file formats."""
@@ -186,10 +446,11 @@ class DocumentProcessor:
     def validate_file(self, file_path: str) -> bool:
         """Validate if a file can be processed."""
         try:
-            file_path = Path(file_path)
-            return (file_path.exists() and 
-                   file_path.is_file() and 
-                   file_path.suffix.lower() in self.supported_extensions)
+            # Suffix check is free; the single isfile stat runs only for
+            # candidate extensions
+            if os.path.splitext(file_path)[1].lower() not in self.supported_extensions:
+                return False
+            return os.path.isfile(file_path)
         except Exception:
             return False
 
@@ -4,15 +4,17 @@ Modular LLM manager supporting multiple providers.
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional
 import logging
-from langchain_openai import ChatOpenAI
-from langchain_community.llms import HuggingFacePipeline
-from langchain.schema import HumanMessage, SystemMessage
-from transformers import AutoTokenizer, AutoModelForCausalLM, pipeline
-import torch
 from .config import config
 
+# torch / transformers / langchain are imported inside the providers that
+# need them: top-level imports cost seconds and hundreds of MB of RSS even
+# for workflows that never touch the corresponding backend
+
 logger = logging.getLogger(__name__)
 
+# Role prefixes for plain-prompt formatting of chat messages
+_ROLE_PREFIXES = {"system": "System: ", "user": "User: ", "assistant": "Assistant: "}
+
 class BaseLLM(ABC):
     """Abstract base class for LLM implementations."""
     
@@ -20,7 +22,11 @@ class BaseLLM(ABC):
     def generate(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """Generate response from messages."""
         pass
-    
+
+    def generate_stream(self, messages: List[Dict[str, str]], **kwargs):
+        """Yield response tokens; by default the full response in one piece."""
+        yield self.generate(messages, **kwargs)
+
     @abstractmethod
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the model."""
@@ -35,7 +41,9 @@ class OpenAILLM(BaseLLM):
         
         if not self.api_key:
             raise ValueError("OpenAI API key is required")
-        
+
+        from langchain_openai import ChatOpenAI
+
         self.llm = ChatOpenAI(
             model=self.model_name,
             openai_api_key=self.api_key,
@@ -43,22 +51,36 @@ class OpenAILLM(BaseLLM):
             max_tokens=config.MAX_TOKENS
         )
     
+    def _convert_messages(self, messages: List[Dict[str, str]]) -> list:
+        """Convert messages to LangChain format."""
+        from langchain.schema import HumanMessage, SystemMessage
+
+        langchain_messages = []
+        for msg in messages:
+            if msg["role"] == "system":
+                langchain_messages.append(SystemMessage(content=msg["content"]))
+            else:
+                langchain_messages.append(HumanMessage(content=msg["content"]))
+        return langchain_messages
+
     def generate(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """Generate response using OpenAI."""
         try:
-            # Convert messages to LangChain format
-            langchain_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    langchain_messages.append(SystemMessage(content=msg["content"]))
-                else:
-                    langchain_messages.append(HumanMessage(content=msg["content"]))
-            
-            response = self.llm.invoke(langchain_messages)
+            response = self.llm.invoke(self._convert_messages(messages))
             return response.content
         except Exception as e:
             logger.error(f"Error generating response with OpenAI: {e}")
             return f"Error: {str(e)}"
+
+    def generate_stream(self, messages: List[Dict[str, str]], **kwargs):
+        """Yield response tokens as OpenAI produces them."""
+        try:
+            for chunk in self.llm.stream(self._convert_messages(messages)):
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            logger.error(f"Error streaming response with OpenAI: {e}")
+            yield f"Error: {str(e)}"
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get OpenAI model information."""
@@ -71,21 +93,78 @@ class OpenAILLM(BaseLLM):
 
 class HuggingFaceLLM(BaseLLM):
     """Hugging Face LLM implementation."""
-    
+
     def __init__(self, model_name: str = None, api_key: str = None):
         self.model_name = model_name or config.HUGGINGFACE_MODEL
         self.api_key = api_key or config.HUGGINGFACE_API_KEY
-        
+        # Weights are loaded lazily on first generate(); startup pays
+        # nothing if the provider is never used
+        self.tokenizer = None
+        self.model = None
+        self.pipeline = None
+        self.llm = None
+        self._loaded = False
+        # Token IDs of constant prompt fragments, encoded once per process
+        self._encode_cache: Dict[str, List[int]] = {}
+
+    def _load_model(self, dtype):
+        """Load model weights, preferring 8-bit quantization where available."""
+        import torch
+        from transformers import AutoModelForCausalLM
+
+        try:
+            import bitsandbytes  # noqa: F401
+            from transformers import BitsAndBytesConfig
+            if torch.cuda.is_available():
+                # 8-bit weights cut VRAM and memory bandwidth per token
+                return AutoModelForCausalLM.from_pretrained(
+                    self.model_name,
+                    quantization_config=BitsAndBytesConfig(load_in_8bit=True),
+                    device_map="auto",
+                    trust_remote_code=True
+                )
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.warning(f"8-bit load failed, falling back to {dtype}: {e}")
+
+        return AutoModelForCausalLM.from_pretrained(
+            self.model_name,
+            torch_dtype=dtype,
+            device_map="auto",
+            trust_remote_code=True
+        )
+
+    def _ensure_loaded(self):
+        """Load tokenizer, model and pipeline on first use."""
+        if self._loaded:
+            return
+
         try:
+            import torch
+            from langchain_community.llms import HuggingFacePipeline
+            from transformers import AutoTokenizer, pipeline
+
+            # Prefer bfloat16 where the hardware supports it: same quality
+            # as fp16 with better matmul throughput on Ampere+ GPUs
+            dtype = torch.float16
+            if torch.cuda.is_available() and torch.cuda.is_bf16_supported():
+                dtype = torch.bfloat16
+
             # Initialize tokenizer and model
             self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-            self.model = AutoModelForCausalLM.from_pretrained(
-                self.model_name,
-                torch_dtype=torch.float16,
-                device_map="auto",
-                trust_remote_code=True
-            )
-            
+            self.model = self._load_model(dtype)
+            self.model.eval()
+
+            # torch.compile strips eager-mode Python overhead per token;
+            # fall back to the eager model where unsupported
+            if torch.__version__ >= "2.1":
+                try:
+                    self.model = torch.compile(self.model, mode="reduce-overhead",
+                                               fullgraph=False)
+                except Exception as e:
+                    logger.warning(f"torch.compile unavailable, using eager model: {e}")
+
             # Create pipeline
             self.pipeline = pipeline(
                 "text-generation",
@@ -94,40 +173,94 @@ class HuggingFaceLLM(BaseLLM):
                 max_new_tokens=config.MAX_TOKENS,
                 temperature=config.TEMPERATURE,
                 do_sample=True,
+                use_cache=True,
                 pad_token_id=self.tokenizer.eos_token_id
             )
             
             # Create LangChain wrapper
             self.llm = HuggingFacePipeline(pipeline=self.pipeline)
-            
+
+            self._loaded = True
+
         except Exception as e:
             logger.error(f"Error initializing Hugging Face model: {e}")
             raise
-    
+
     def generate(self, messages: List[Dict[str, str]], **kwargs) -> str:
         """Generate response using Hugging Face model."""
         try:
+            import torch
+
+            self._ensure_loaded()
+
             # Format messages for the model
             prompt = self._format_messages(messages)
-            response = self.llm.invoke(prompt)
+            with torch.inference_mode():
+                response = self.llm.invoke(prompt)
             return response
         except Exception as e:
             logger.error(f"Error generating response with Hugging Face: {e}")
             return f"Error: {str(e)}"
     
+    def _encode_cached(self, text: str) -> List[int]:
+        """Tokenize a constant prompt fragment once and reuse the IDs."""
+        ids = self._encode_cache.get(text)
+        if ids is None:
+            ids = self.tokenizer.encode(text, add_special_tokens=False)
+            self._encode_cache[text] = ids
+        return ids
+
+    def generate_with_context(self, prefix: str, context_text: str, suffix: str,
+                              query: str, **kwargs) -> str:
+        """Generate with cached token IDs for the constant prompt halves.
+
+        Mirrors the _format_messages layout but only tokenizes the context
+        and query per call; the boilerplate fragments keep their encodings,
+        and model.generate is called directly, skipping the pipeline wrapper.
+        """
+        try:
+            import torch
+
+            self._ensure_loaded()
+
+            input_ids = (self._encode_cached("System: " + prefix)
+                         + self.tokenizer.encode(context_text, add_special_tokens=False)
+                         + self._encode_cached(suffix + "\nUser: ")
+                         + self.tokenizer.encode(query + "\nAssistant: ",
+                                                 add_special_tokens=False))
+
+            input_tensor = torch.tensor([input_ids], device=self.model.device)
+            with torch.inference_mode():
+                output = self.model.generate(
+                    input_tensor,
+                    max_new_tokens=config.MAX_TOKENS,
+                    temperature=config.TEMPERATURE,
+                    do_sample=True,
+                    pad_token_id=self.tokenizer.eos_token_id
+                )
+            return self.tokenizer.decode(output[0][input_tensor.shape[1]:],
+                                         skip_special_tokens=True)
+
+        except Exception as e:
+            logger.error(f"Error in tokenizer fast path, using pipeline: {e}")
+            messages = [{"role": "system", "content": prefix + context_text + suffix},
+                        {"role": "user", "content": query}]
+            return self.generate(messages, **kwargs)
+
     def _format_messages(self, messages: List[Dict[str, str]]) -> str:
         """Format messages for Hugging Face models."""
-        formatted = ""
+        # Collect parts and join once; += concatenation re-allocates the
+        # whole prompt for every message
+        parts = []
         for msg in messages:
-            if msg["role"] == "system":
-                formatted += f"System: {msg['content']}\n"
-            elif msg["role"] == "user":
-                formatted += f"User: {msg['content']}\n"
-            elif msg["role"] == "assistant":
-                formatted += f"Assistant: {msg['content']}\n"
-        
-        formatted += "Assistant: "
-        return formatted
+            prefix = _ROLE_PREFIXES.get(msg["role"])
+            if prefix:
+                parts.append(prefix)
+                parts.append(msg["content"])
+                parts.append("\n")
+
+        parts.append("Assistant: ")
+        return "".join(parts)
     
     def get_model_info(self) -> Dict[str, Any]:
         """Get Hugging Face model information."""
@@ -192,7 +325,32 @@ class LLMManager:
             return "Error: No LLM provider available"
         
         return llm.generate(messages, **kwargs)
-    
+
+    def generate_with_context(self, prefix: str, context_text: str, suffix: str,
+                              query: str, provider: str = None, **kwargs) -> str:
+        """Generate using a provider's prompt fast path when it has one."""
+        llm = self.get_llm(provider)
+        if not llm:
+            return "Error: No LLM provider available"
+
+        if isinstance(llm, HuggingFaceLLM):
+            return llm.generate_with_context(prefix, context_text, suffix, query, **kwargs)
+
+        messages = [
+            {"role": "system", "content": prefix + context_text + suffix},
+            {"role": "user", "content": query}
+        ]
+        return llm.generate(messages, **kwargs)
+
+    def generate_response_stream(self, messages: List[Dict[str, str]], provider: str = None, **kwargs):
+        """Yield response tokens using specified or active provider."""
+        llm = self.get_llm(provider)
+        if not llm:
+            yield "Error: No LLM provider available"
+            return
+
+        yield from llm.generate_stream(messages, **kwargs)
+
     def get_provider_info(self, provider: str = None) -> Dict[str, Any]:
         """Get information about specified or active provider."""
         llm = self.get_llm(provider)
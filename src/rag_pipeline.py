@@ -1,62 +1,196 @@
 """
 RAG pipeline for document processing and response generation.
 """
+import hashlib
 import logging
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from . import _chunk
 from .llm_manager import llm_manager
 from .vector_store import vector_store
 from .config import config
 
 logger = logging.getLogger(__name__)
 
+# blake3 is SIMD-accelerated; stdlib blake2b is the fallback
+try:
+    from blake3 import blake3 as _blake3
+except ImportError:
+    _blake3 = None
+
+def _chunk_digest(text: str) -> bytes:
+    """16-byte content digest used to deduplicate chunks before embedding."""
+    encoded = text.encode('utf-8')
+    if _blake3 is not None:
+        return _blake3(encoded).digest(length=16)
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+_NO_CONTEXT_MESSAGE = ("I don't have enough information to answer that question. "
+                       "Please try rephrasing or ask about a different topic.")
+
+_RESPONSE_CACHE_SIZE = 128
+
+# Constant halves of the system prompt; the context text is sandwiched
+# between them without any f-string formatting or leaked indentation
+_SYS_PREFIX = ("You are a helpful AI assistant. Use the following context to answer "
+               "the user's question. If the context doesn't contain enough information "
+               "to answer the question, say so.\n\nContext:\n")
+_SYS_SUFFIX = "\n\nAnswer the user's question based on the context provided."
+
 class RAGPipeline:
     """Main RAG pipeline orchestrator."""
     
     def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=config.CHUNK_SIZE,
-            chunk_overlap=config.CHUNK_OVERLAP,
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        # Fallback splitter is built on first use; importing langchain is
+        # slow and unnecessary while the jitted splitter handles the work
+        self.text_splitter = None
+        # LRU memoization of LLM responses keyed by query + retrieved context
+        self._response_cache: OrderedDict = OrderedDict()
+        # Digests of chunks already sent to the vector store this process;
+        # duplicates (shared nav/footer boilerplate in scraped pages) would
+        # otherwise each pay a full embedding forward pass
+        self._seen_chunk_hashes: set = set()
+
+    def _split_text(self, text: str) -> List[str]:
+        """Split text into chunks, preferring the jitted offset splitter."""
+        if _chunk.NUMBA_AVAILABLE:
+            return _chunk.split_text(text, config.CHUNK_SIZE, config.CHUNK_OVERLAP)
+        if self.text_splitter is None:
+            from langchain.text_splitter import RecursiveCharacterTextSplitter
+            self.text_splitter = RecursiveCharacterTextSplitter(
+                chunk_size=config.CHUNK_SIZE,
+                chunk_overlap=config.CHUNK_OVERLAP,
+                length_function=len,
+                separators=["\n\n", "\n", " ", ""]
+            )
+        return self.text_splitter.split_text(text)
     
+    def warmup(self) -> None:
+        """Pre-load heavy components so the first request doesn't pay for them."""
+        try:
+            self._split_text("warmup")
+            vector_store.search("warmup")
+        except Exception as e:
+            logger.error(f"Error warming up RAG pipeline: {e}")
+
+    def _iter_chunks(self, documents: List[Dict[str, Any]]):
+        """Yield (chunk document, digest) pairs without materializing all of them.
+
+        Chunks whose content digest has already been seen are skipped, so
+        repeated boilerplate is embedded at most once. Survivors keep their
+        original chunk_index / total_chunks. Digests are only committed to
+        the seen-set by the caller once their batch is actually stored;
+        this generator tracks the current call's own yields separately.
+        """
+        skipped = 0
+        yielded = set()
+        for doc in documents:
+            # Split document into chunks
+            chunks = self._split_text(doc["text"])
+            total_chunks = len(chunks)
+
+            # Base metadata is built once per document, not once per chunk
+            base_metadata = {**doc.get("metadata", {}), "source_id": doc["id"]}
+
+            for i, chunk in enumerate(chunks):
+                digest = _chunk_digest(chunk)
+                if digest in self._seen_chunk_hashes or digest in yielded:
+                    skipped += 1
+                    continue
+                yielded.add(digest)
+                # dict(base, ...) copies at C speed; a ** spread here would
+                # re-walk the metadata keys for every chunk
+                yield {
+                    "id": f"{doc['id']}_chunk_{i}",
+                    "text": chunk,
+                    "metadata": dict(base_metadata, chunk_index=i,
+                                     total_chunks=total_chunks)
+                }, digest
+
+        if skipped:
+            logger.info(f"Skipped {skipped} duplicate chunks before embedding")
+
+    def _store_in_batches(self, documents: List[Dict[str, Any]], batch_size: int) -> bool:
+        """Drive _iter_chunks, flushing to the vector store every batch_size chunks.
+
+        Only one batch of chunks is held in memory at a time, so peak RSS no
+        longer scales with the combined size of all documents' chunk lists.
+        """
+        batch = []
+        batch_digests = []
+        stored_chunks = 0
+
+        for chunk_doc, digest in self._iter_chunks(documents):
+            batch.append(chunk_doc)
+            batch_digests.append(digest)
+            if len(batch) >= batch_size:
+                if not vector_store.add_documents(batch):
+                    return False
+                # Digests count as seen only once the store accepted the
+                # batch; otherwise a failed write would make the dedupe
+                # set swallow the retry
+                self._seen_chunk_hashes.update(batch_digests)
+                stored_chunks += len(batch)
+                batch = []
+                batch_digests = []
+
+        if batch:
+            if not vector_store.add_documents(batch):
+                return False
+            self._seen_chunk_hashes.update(batch_digests)
+            stored_chunks += len(batch)
+
+        # New documents can change answers, so memoized responses go stale
+        self.clear_cache()
+
+        logger.info(f"Processed {len(documents)} documents into {stored_chunks} chunks "
+                    f"(batch size {batch_size})")
+        return True
+
     def process_documents(self, documents: List[Dict[str, Any]]) -> bool:
         """Process and store documents in the vector database."""
         try:
-            processed_chunks = []
-            
-            for doc in documents:
-                # Split document into chunks
-                chunks = self.text_splitter.split_text(doc["text"])
-                
-                # Create chunk documents
-                for i, chunk in enumerate(chunks):
-                    chunk_doc = {
-                        "id": f"{doc['id']}_chunk_{i}",
-                        "text": chunk,
-                        "metadata": {
-                            **doc.get("metadata", {}),
-                            "chunk_index": i,
-                            "total_chunks": len(chunks),
-                            "source_id": doc["id"]
-                        }
-                    }
-                    processed_chunks.append(chunk_doc)
-            
-            # Store in vector database
-            success = vector_store.add_documents(processed_chunks)
-            
-            if success:
-                logger.info(f"Processed {len(documents)} documents into {len(processed_chunks)} chunks")
-            
-            return success
-            
+            return self._store_in_batches(documents, batch_size=256)
+
         except Exception as e:
             logger.error(f"Error processing documents: {e}")
             return False
-    
-    def generate_response(self, query: str, context: List[Dict[str, Any]] = None, 
+
+    def process_documents_batched(self, documents: List[Dict[str, Any]],
+                                  embed_batch_size: int = None) -> bool:
+        """Process documents with batched embedding across all chunks.
+
+        Chunks from all documents are streamed to the vector store in
+        fixed-size batches, so the embedding model sees large batched calls
+        instead of one call per document.
+        """
+        try:
+            batch_size = embed_batch_size or config.EMBEDDING_BATCH_SIZE
+            return self._store_in_batches(documents, batch_size=batch_size)
+
+        except Exception as e:
+            logger.error(f"Error processing documents in batches: {e}")
+            return False
+
+    def clear_cache(self) -> None:
+        """Drop memoized responses."""
+        self._response_cache.clear()
+
+    def _context_text(self, context: List[Dict[str, Any]]) -> str:
+        """Join retrieved chunks into the numbered context block."""
+        return "\n\n".join(f"Context {i+1}: {doc['text']}"
+                           for i, doc in enumerate(context))
+
+    def _build_messages(self, query: str, context: List[Dict[str, Any]]) -> List[Dict[str, str]]:
+        """Build the LLM message list with the retrieved context embedded."""
+        system_message = _SYS_PREFIX + self._context_text(context) + _SYS_SUFFIX
+
+        return [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": query}
+        ]
+
+    def generate_response(self, query: str, context: List[Dict[str, Any]] = None,
                          provider: str = None) -> str:
         """Generate response using RAG approach."""
         try:
@@ -66,29 +200,33 @@ class RAGPipeline:
             
             if not context:
                 logger.warning("No relevant context found for query")
-                return "I don't have enough information to answer that question. Please try rephrasing or ask about a different topic."
-            
-            # Prepare system message with context
-            context_text = "\n\n".join([f"Context {i+1}: {doc['text']}" 
-                                       for i, doc in enumerate(context)])
-            
-            system_message = f"""You are a helpful AI assistant. Use the following context to answer the user's question. 
-            If the context doesn't contain enough information to answer the question, say so.
-            
-            Context:
-            {context_text}
-            
-            Answer the user's question based on the context provided."""
-            
-            # Prepare messages for LLM
-            messages = [
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": query}
-            ]
-            
-            # Generate response
-            response = llm_manager.generate_response(messages, provider=provider)
-            
+                return _NO_CONTEXT_MESSAGE
+
+            # Same query over the same retrieved chunks gives the same
+            # answer, so repeat calls skip the LLM entirely
+            cache_key = (query,
+                         tuple(doc.get("id") for doc in context),
+                         provider or llm_manager.active_provider)
+            cached = self._response_cache.get(cache_key)
+            if cached is not None:
+                self._response_cache.move_to_end(cache_key)
+                return cached
+
+            # Generate response; the context-aware entry point lets the
+            # Hugging Face backend reuse cached encodings of the constant
+            # prompt halves instead of re-tokenizing them every call
+            response = llm_manager.generate_with_context(
+                _SYS_PREFIX, self._context_text(context), _SYS_SUFFIX, query,
+                provider=provider)
+
+            # Provider failures come back as "Error: ..." strings rather
+            # than exceptions; memoizing one would replay a transient
+            # hiccup as a sticky wrong answer until eviction
+            if not response.startswith("Error"):
+                self._response_cache[cache_key] = response
+                if len(self._response_cache) > _RESPONSE_CACHE_SIZE:
+                    self._response_cache.popitem(last=False)
+
             return response
             
         except Exception as e:
@@ -117,6 +255,36 @@ class RAGPipeline:
             logger.error(f"Error in chat: {e}")
             return f"Error in chat: {str(e)}"
     
+    def chat_stream(self, messages: List[Dict[str, str]], provider: str = None):
+        """Yield response tokens for a chat conversation with RAG enhancement."""
+        try:
+            if not messages:
+                yield "No messages provided"
+                return
+
+            # Get the last user message
+            last_message = messages[-1]
+            if last_message["role"] != "user":
+                yield "Last message must be from user"
+                return
+
+            query = last_message["content"]
+
+            # Retrieve relevant documents
+            context = vector_store.search(query)
+            if not context:
+                logger.warning("No relevant context found for query")
+                yield _NO_CONTEXT_MESSAGE
+                return
+
+            # Stream tokens as the provider produces them
+            llm_messages = self._build_messages(query, context)
+            yield from llm_manager.generate_response_stream(llm_messages, provider=provider)
+
+        except Exception as e:
+            logger.error(f"Error in chat stream: {e}")
+            yield f"Error in chat: {str(e)}"
+
     def get_pipeline_info(self) -> Dict[str, Any]:
         """Get information about the RAG pipeline."""
         return {
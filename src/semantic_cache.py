@@ -0,0 +1,163 @@
+"""
+Semantic response cache for near-duplicate chat queries.
+"""
+import logging
+import threading
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from ._kernels import topk_cosine
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+# Hard cap on cached entries so the hottest public endpoint can't grow
+# the cache without bound
+_MAX_ENTRIES = 1024
+
+class SemanticCache:
+    """Cache chat responses keyed by query-embedding similarity.
+
+    The last user message is embedded and matched against previously seen
+    queries; when cosine similarity exceeds the configured threshold and the
+    entry is still within its TTL, the stored response is returned and the
+    whole retrieval + LLM round-trip is skipped.
+    """
+
+    def __init__(self, threshold: float = None, ttl: int = None):
+        self.threshold = threshold if threshold is not None else config.SEMANTIC_CACHE_THRESHOLD
+        self.ttl = ttl if ttl is not None else config.SEMANTIC_CACHE_TTL
+        self._lock = threading.Lock()
+        self._embedder = None
+        self._index = None
+        self._vectors: List[np.ndarray] = []
+        self._entries: List[tuple] = []
+
+    def embed(self, query: str) -> np.ndarray:
+        """Embed a query as a normalized float32 vector (model loaded lazily).
+
+        Runs outside the cache lock so concurrent requests aren't serialized
+        through one SentenceTransformer forward pass; callers embed once and
+        pass the vector to both get() and put().
+        """
+        if self._embedder is None:
+            with self._lock:
+                if self._embedder is None:
+                    from sentence_transformers import SentenceTransformer
+                    self._embedder = SentenceTransformer(config.EMBEDDING_MODEL)
+        vector = self._embedder.encode([query], normalize_embeddings=True)[0]
+        return np.asarray(vector, dtype=np.float32)
+
+    def _search(self, vector: np.ndarray) -> tuple:
+        """Return (best_index, best_score) over cached query vectors."""
+        if self._index is not None:
+            scores, indices = self._index.search(vector.reshape(1, -1), 1)
+            return int(indices[0][0]), float(scores[0][0])
+        if self._vectors:
+            indices, scores = topk_cosine(vector, np.vstack(self._vectors), 1)
+            return int(indices[0]), float(scores[0])
+        return -1, 0.0
+
+    def _rebuild_index(self) -> None:
+        """Rebuild the FAISS index; IndexFlatIP can't remove single vectors."""
+        if faiss is None:
+            return
+        self._index = None
+        if self._vectors:
+            index = faiss.IndexFlatIP(self._vectors[0].shape[0])
+            index.add(np.vstack(self._vectors))
+            self._index = index
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then the oldest, to stay under the cap.
+
+        Expired vectors must leave the index too — left in place they keep
+        winning the k=1 similarity search and shadow their query region
+        with permanent misses.
+        """
+        keep = [i for i, (_, timestamp) in enumerate(self._entries)
+                if now - timestamp <= self.ttl]
+        if len(keep) >= _MAX_ENTRIES:
+            # Entries are appended in time order, so the front is oldest;
+            # leave room for the entry about to be inserted
+            keep = keep[-(_MAX_ENTRIES - 1):]
+        if len(keep) != len(self._entries):
+            self._entries = [self._entries[i] for i in keep]
+            self._vectors = [self._vectors[i] for i in keep]
+            self._rebuild_index()
+
+    def warmup(self) -> None:
+        """Load the embedding model so the first lookup is not multi-second."""
+        try:
+            self.embed("warmup")
+        except Exception as e:
+            logger.error(f"Error warming up semantic cache: {e}")
+
+    def get(self, query: str, vector: np.ndarray = None) -> Optional[str]:
+        """Return a cached response for a semantically similar query, if any."""
+        try:
+            if vector is None:
+                vector = self.embed(query)
+            with self._lock:
+                if not self._entries:
+                    return None
+                best, score = self._search(vector)
+                if best < 0 or score < self.threshold:
+                    return None
+                response, timestamp = self._entries[best]
+                if time.monotonic() - timestamp > self.ttl:
+                    # Remove the stale entry so it stops shadowing this
+                    # query region in future searches
+                    del self._entries[best]
+                    del self._vectors[best]
+                    self._rebuild_index()
+                    return None
+                logger.info(f"Semantic cache hit (score {score:.3f})")
+                return response
+        except Exception as e:
+            logger.error(f"Error querying semantic cache: {e}")
+            return None
+
+    def put(self, query: str, response: str, vector: np.ndarray = None) -> None:
+        """Store a response under the query's embedding.
+
+        Error and fallback responses are never cached: replaying a transient
+        provider failure for every similar query until the TTL expires would
+        turn a hiccup into a sticky outage.
+        """
+        if not response or response.startswith("Error"):
+            return
+        try:
+            if vector is None:
+                vector = self.embed(query)
+            with self._lock:
+                now = time.monotonic()
+                if len(self._entries) >= _MAX_ENTRIES:
+                    self._evict(now)
+                # Vectors are kept alongside the index so evictions can
+                # rebuild it
+                self._vectors.append(vector)
+                if faiss is not None:
+                    if self._index is None:
+                        self._index = faiss.IndexFlatIP(vector.shape[0])
+                    self._index.add(vector.reshape(1, -1))
+                self._entries.append((response, now))
+        except Exception as e:
+            logger.error(f"Error updating semantic cache: {e}")
+
+    def clear(self) -> None:
+        """Drop all cached responses (e.g. after new documents are indexed)."""
+        with self._lock:
+            self._index = None
+            self._vectors = []
+            self._entries = []
+
+# Global semantic cache instance
+semantic_cache = SemanticCache()
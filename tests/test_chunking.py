@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Test suite for the offset-based text splitter.
+"""
+import sys
+import unittest
+from pathlib import Path
+
+# Add src directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from src._chunk import split_offsets, split_text
+
+CHUNK_SIZE = 100
+OVERLAP = 20
+
+class TestSplitText(unittest.TestCase):
+    """Test cases for the offset-based text splitter."""
+
+    def test_empty_text(self):
+        """Empty input produces no chunks."""
+        self.assertEqual(split_text("", CHUNK_SIZE, OVERLAP), [])
+
+    def test_short_text(self):
+        """Text shorter than chunk_size comes back as a single chunk."""
+        self.assertEqual(split_text("short text", CHUNK_SIZE, OVERLAP),
+                         ["short text"])
+
+    def test_chunk_size_invariant(self):
+        """No chunk exceeds chunk_size, for separator-rich and plain text."""
+        texts = [
+            "word " * 500,
+            "line\n" * 300,
+            "para\n\n" * 200,
+            "Sentence one. Sentence two.\n\nAnother paragraph here.\n" * 50,
+        ]
+        for text in texts:
+            for chunk in split_text(text, CHUNK_SIZE, OVERLAP):
+                self.assertLessEqual(len(chunk), CHUNK_SIZE)
+
+    def test_no_separator_hard_cuts(self):
+        """Unbreakable text is hard-cut at chunk_size, losing nothing."""
+        text = "x" * 3500
+        offsets = split_offsets(text, CHUNK_SIZE, OVERLAP)
+        self.assertTrue(all(end - start <= CHUNK_SIZE for start, end in offsets))
+        covered = set()
+        for start, end in offsets:
+            covered.update(range(start, end))
+        self.assertEqual(covered, set(range(len(text))))
+
+    def test_all_text_covered(self):
+        """Every character position falls inside at least one offset pair."""
+        text = "The quick brown fox jumps over the lazy dog. " * 40
+        offsets = split_offsets(text, CHUNK_SIZE, OVERLAP)
+        covered = set()
+        for start, end in offsets:
+            covered.update(range(start, end))
+        self.assertEqual(covered, set(range(len(text))))
+
+    def test_overlap_between_chunks(self):
+        """Consecutive chunks overlap: each starts before the previous ends."""
+        text = "word " * 500
+        offsets = split_offsets(text, CHUNK_SIZE, OVERLAP)
+        self.assertGreater(len(offsets), 1)
+        for i in range(1, len(offsets)):
+            self.assertLess(offsets[i][0], offsets[i - 1][1])
+            self.assertGreater(offsets[i][0], offsets[i - 1][0])
+
+    def test_paragraph_break_preferred(self):
+        """A paragraph break beats a later newline or space as the cut point."""
+        text = "a" * 50 + "\n\n" + "b" * 20 + "\n" + "c" * 20 + " " + "d" * 100
+        offsets = split_offsets(text, CHUNK_SIZE, OVERLAP)
+        # First cut lands right after the \n\n even though \n and space
+        # appear closer to the chunk_size limit
+        self.assertEqual(offsets[0][1], 52)
+
+    def test_newline_preferred_over_space(self):
+        """Without a paragraph break, a newline beats a space."""
+        text = "a" * 50 + "\n" + "b" * 20 + " " + "c" * 100
+        offsets = split_offsets(text, CHUNK_SIZE, OVERLAP)
+        self.assertEqual(offsets[0][1], 51)
+
+    def test_space_cut(self):
+        """With only spaces available, the cut lands on the last space."""
+        text = "a" * 80 + " " + "b" * 80
+        offsets = split_offsets(text, CHUNK_SIZE, OVERLAP)
+        self.assertEqual(offsets[0][1], 81)
+
+    def test_non_bmp_text(self):
+        """Astral-plane characters split on character, not byte, offsets."""
+        text = ("😀🎉🚀 emoji text with astral characters 𝄞𝄢 " * 30)
+        chunks = split_text(text, CHUNK_SIZE, OVERLAP)
+        self.assertTrue(all(len(chunk) <= CHUNK_SIZE for chunk in chunks))
+        # No surrogate halves or replacement characters from a bad cut
+        for chunk in chunks:
+            chunk.encode("utf-8")
+            self.assertNotIn("�", chunk)
+
+    def test_dense_separators_grow_buffer(self):
+        """Separator-dense text overflowing the row estimate still splits."""
+        # Tiny overlap-heavy config forces far more chunks than the
+        # initial n // (chunk_size - overlap) estimate
+        text = ("ab\n\n" * 500)
+        chunks = split_text(text, 10, 8)
+        self.assertTrue(all(len(chunk) <= 10 for chunk in chunks))
+        self.assertTrue(all(chunks))
+
+    def test_strips_and_drops_empty_chunks(self):
+        """Whitespace-only chunks are dropped and survivors are stripped."""
+        text = "first\n\n \n\n  second  "
+        chunks = split_text(text, 10, 2)
+        self.assertTrue(all(chunk == chunk.strip() and chunk for chunk in chunks))
+
+if __name__ == "__main__":
+    unittest.main()
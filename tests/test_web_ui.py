@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Smoke tests for the inline web UI served by the API.
+"""
+import ast
+import unittest
+from pathlib import Path
+
+API_SOURCE = Path(__file__).parent.parent / "src" / "api.py"
+
+def _load_index_html() -> str:
+    """Extract the _INDEX_HTML constant from src/api.py without importing it.
+
+    Importing src.api needs the full dependency stack; the served page is a
+    module-level string constant, so the AST is enough.
+    """
+    tree = ast.parse(API_SOURCE.read_text(encoding="utf-8"))
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id == "_INDEX_HTML":
+                    return ast.literal_eval(node.value)
+    raise AssertionError("_INDEX_HTML not found in src/api.py")
+
+def _extract_script(html: str) -> str:
+    """Return the contents of the page's <script> block."""
+    start = html.index("<script>") + len("<script>")
+    end = html.index("</script>")
+    return html[start:end]
+
+class TestWebUI(unittest.TestCase):
+    """Smoke checks that the emitted page carries valid inline JS."""
+
+    def setUp(self):
+        self.html = _load_index_html()
+        self.script = _extract_script(self.html)
+
+    def test_no_raw_newline_in_js_strings(self):
+        """No quoted JS string may span a line break (JS SyntaxError)."""
+        quote = None
+        escaped = False
+        for lineno, line in enumerate(self.script.split("\n"), 1):
+            for char in line:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif quote is None and char in "'\"":
+                    quote = char
+                elif char == quote:
+                    quote = None
+            self.assertIsNone(
+                quote,
+                f"unterminated {quote} string on script line {lineno}: {line.strip()}")
+
+    def test_sse_split_delimiter_is_escaped(self):
+        """The SSE event delimiter must reach the browser as literal \\n\\n."""
+        self.assertIn("buffer.split('\\n\\n')", self.html)
+
+    def test_handlers_present(self):
+        """The page wires up the chat and upload entry points."""
+        for name in ("sendMessage", "addMessage", "uploadFiles"):
+            self.assertIn(f"function {name}(", self.script)
+
+if __name__ == "__main__":
+    unittest.main()